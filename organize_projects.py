@@ -13,27 +13,42 @@ organize_projects.py
 """
 from pathlib import Path
 import argparse
+import errno
 import shutil
 import sys
 import subprocess
 import os
 import hashlib
+import mmap
 import zipfile
 import tempfile
-from typing import List, Set, Dict, Optional
+import concurrent.futures
+import contextlib
+import multiprocessing
+from collections import deque, namedtuple
+from typing import List, Set, Dict, Optional, Tuple
+import importlib.util
 import xml.etree.ElementTree as ET
 from urllib.parse import urljoin, quote, unquote
+import atexit
 import datetime
+import functools
+import queue
+import re
+import socket
+import stat
+import struct
 import io
+import zlib
+import threading
+import time
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
 
 # optional imports
-try:
-    import docx2pdf
-    _HAS_DOCX2PDF = True
-except Exception:
-    _HAS_DOCX2PDF = False
+# docx2pdf 只探测可用性，真正导入推迟到首次转换（它会连带拉起 pywin32/COM）
+_HAS_DOCX2PDF = importlib.util.find_spec("docx2pdf") is not None
 
 try:
     from pypdf import PdfWriter
@@ -41,55 +56,164 @@ try:
 except Exception:
     _HAS_PYPDF = False
 
-# pypinyin for sorting by pinyin initial
+# pikepdf（QPDF 的 C++ 后端）合并 PDF 比 pypdf 快数倍且内存占用低（可选）
 try:
+    import pikepdf
+    _HAS_PIKEPDF = True
+except Exception:
+    _HAS_PIKEPDF = False
+
+# pypinyin for sorting by pinyin initial
+# 只探测是否可用，导入推迟到第一次排序：加载 CJK 拼音字典要数 MB 内存
+# 和可观的冷启动时间，纯英文数据集或 dry-run 可能根本用不到
+_HAS_PYPINYIN = importlib.util.find_spec("pypinyin") is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _pypinyin():
+    """一次性完成 pypinyin 的实际导入，返回 (lazy_pinyin, Style)。"""
     from pypinyin import lazy_pinyin, Style
-    _HAS_PYPINYIN = True
+    return lazy_pinyin, Style
+
+
+# python-uno（LibreOffice 自带的 Python 绑定），用于复用常驻 soffice 实例
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    _HAS_UNO = True
 except Exception:
-    _HAS_PYPINYIN = False
+    _HAS_UNO = False
 
-# GUI imports
+# xxhash for fast content hashing during dedup (optional, falls back to hashlib)
 try:
-    import tkinter as tk
-    from tkinter import filedialog, messagebox, scrolledtext
-    _HAS_TKINTER = True
+    import xxhash
+    _HAS_XXHASH = True
 except Exception:
-    _HAS_TKINTER = False
+    _HAS_XXHASH = False
 
-# optional imports
+# libdeflate（deflate 包）整段 inflate 比 zlib 流式快 2~3 倍（可选，回退 zipfile）
 try:
-    import docx2pdf
-    _HAS_DOCX2PDF = True
+    import deflate
+    _HAS_LIBDEFLATE = True
 except Exception:
-    _HAS_DOCX2PDF = False
+    _HAS_LIBDEFLATE = False
 
+# lxml 的 C 层 iterparse 解析大体量 PROPFIND 响应比 stdlib 快数倍（可选）
 try:
-    from pypdf import PdfWriter
-    _HAS_PYPDF = True
+    from lxml import etree as _lxml_etree
+    _HAS_LXML = True
 except Exception:
-    _HAS_PYPDF = False
+    _HAS_LXML = False
 
-# pypinyin for sorting by pinyin initial
+# numba 用于加速 --near-dedup 的滚动哈希内核（可选）
 try:
-    from pypinyin import lazy_pinyin, Style
-    _HAS_PYPINYIN = True
+    import numpy
+    from numba import njit
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+# GUI imports
+try:
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, scrolledtext
+    _HAS_TKINTER = True
 except Exception:
-    _HAS_PYPINYIN = False
+    _HAS_TKINTER = False
 
 REQUIRED_SUBDIR = "12"
 KAIPING_DIR_NAME = "开评标资料"  # look under 12\开评标资料 for 1..12
 PROCESSED_SUFFIX = "_已处理"
 
 MOVE_FILES_TO_OUTPUT = ["1.pdf", "6.pdf", "8.pdf", "3.pdf", "2.pdf"]
+
+# 9->15、10->16、11->17、12->18 的固定映射：模块级元组，process_project
+# 每次调用不再重建 dict，循环里用属性访问取字段。全局兜底搜索用的
+# 关键字交替正则和 关键字->编号 表也在这里一次性编好。
+_MappingEntry = namedtuple("_MappingEntry", ["idx", "keyword", "target", "allow_merge"])
+_MAPPING_SINGLE = (
+    _MappingEntry(9, "投标报价得分汇总表", "15投标报价得分汇总表.pdf", False),
+    _MappingEntry(10, "评分汇总及得分记录表", "16评分汇总及得分记录表.pdf", True),
+    _MappingEntry(11, "承包商排序表", "17承包商排序表.pdf", False),
+    _MappingEntry(12, "评审报告", "18评审报告.pdf", False),
+)
+_KW_PATTERN = re.compile("|".join(re.escape(e.keyword) for e in _MAPPING_SINGLE))
+_KW_TO_IDX = {e.keyword: e.idx for e in _MAPPING_SINGLE}
+
+# 根目录文件移动到输出目录时的改名规则（未列出的保持原名）
+RENAME_MAP = {
+    "6.pdf": "2招标代理委托合同.pdf",
+    "8.pdf": "5非招标采购文件.pdf",
+    "1.pdf": "1项目批复文件.pdf",
+    "3.pdf": "3项目管理机构（项目经理）任命书.pdf",
+    "2.pdf": "6采购文件澄清（答疑）纪要.pdf",
+}
 DOCX_TO_PDF = {"7.docx": "4竞标采购邀请书.pdf"}  # convert 7.docx -> 4...pdf (rename)
-IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"})
+# endswith 接受元组，热路径上免去一次 splitext 拆分
+_IMG_SUFFIXES = tuple(IMAGE_EXTENSIONS)
 
 
 # ----------------- 工具函数 -----------------
 
 
+# 常用汉字区间；regex 引擎在 C 层扫描，比逐字符的 Python 循环快一个量级
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+
 def has_chinese(s: str) -> bool:
-    return any("\u4e00" <= ch <= "\u9fff" for ch in s)
+    return _CJK_RE.search(s) is not None
+
+
+# 进程工作目录与家目录在运行期间不变，缓存一次供路径规范化使用
+_CWD = os.getcwd()
+_HOME = os.path.expanduser("~")
+
+
+def _fast_resolve(p) -> Path:
+    """CLI 路径参数的快速规范化。
+
+    Path.resolve() 为检测符号链接会对路径上每一级目录 lstat；对仅用于
+    拼接和显示的参数，缓存的家目录/工作目录加 normpath 即可，
+    不产生系统调用。
+    """
+    s = os.fspath(p)
+    if s == "~":
+        s = _HOME
+    elif s.startswith(("~/", "~" + os.sep)):
+        s = _HOME + s[1:]
+    elif s.startswith("~"):  # ~user 形式仍交给标准实现
+        s = os.path.expanduser(s)
+    if not os.path.isabs(s):
+        s = os.path.join(_CWD, s)
+    return Path(os.path.normpath(s))
+
+
+def _kind(p) -> str:
+    """单次 stat 判定路径类型，返回 "file"/"dir"/"other"/"missing"。
+
+    exists()+is_file() 这类组合每问一次就 stat 一次；参数校验只需
+    一次系统调用。
+    """
+    try:
+        mode = os.stat(p).st_mode
+    except OSError:
+        return "missing"
+    if stat.S_ISREG(mode):
+        return "file"
+    if stat.S_ISDIR(mode):
+        return "dir"
+    return "other"
+
+
+@functools.lru_cache(maxsize=256)
+def _numbered_variant_re(base: str, suffix: str):
+    """unique_path 的编号匹配模式，按 (主名, 扩展名) 缓存编译结果。
+
+    同名冲突的文件（1.pdf、7.pdf 等固定目标名）在一个批次里反复出现，
+    不必每次重新编译。
+    """
+    return re.compile(rf"^{re.escape(base)} \((\d+)\){re.escape(suffix)}$")
 
 
 def unique_path(target: Path) -> Path:
@@ -98,12 +222,20 @@ def unique_path(target: Path) -> Path:
     parent = target.parent
     base = target.stem
     suffix = target.suffix
-    i = 1
-    while True:
-        cand = parent / f"{base} ({i}){suffix}"
-        if not cand.exists():
-            return cand
-        i += 1
+    # 一次列目录找出已占用的最大编号，替代逐个 exists() 的线性探测
+    pat = _numbered_variant_re(base, suffix)
+    max_used = 0
+    try:
+        with os.scandir(parent) as it:
+            for e in it:
+                m = pat.match(e.name)
+                if m:
+                    n = int(m.group(1))
+                    if n > max_used:
+                        max_used = n
+    except OSError:
+        pass
+    return parent / f"{base} ({max_used + 1}){suffix}"
 
 
 def move_file(src: Path, dst: Path, dry_run: bool = False):
@@ -115,7 +247,14 @@ def move_file(src: Path, dst: Path, dry_run: bool = False):
         return
     dst.parent.mkdir(parents=True, exist_ok=True)
     t = unique_path(dst)
-    shutil.move(str(src), str(t))
+    # 先试 os.replace（单个原子系统调用），只有内核报跨设备时才回退
+    # shutil.move 的 copy2+unlink 慢路径——省掉原先每次移动前的两次 stat。
+    try:
+        os.replace(str(src), str(t))
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EINVAL):
+            raise
+        shutil.move(str(src), str(t))
     print(f"[OK] Moved: {src} -> {t}")
 
 
@@ -132,19 +271,197 @@ def copy_file(src: Path, dst: Path, dry_run: bool = False):
     print(f"[OK] Copied: {src} -> {t}")
 
 
+class _LibreOfficeServer:
+    """常驻的 LibreOffice 监听进程，经 UNO socket 提交 DOCX -> PDF 转换。
+
+    每次冷启动 soffice 需要 1~3 秒；批处理中每个项目都有一个 7.docx 要转，
+    复用一个监听实例可把启动成本摊薄到整个批次。端口向内核现要、
+    用户配置目录独立生成，进程池的各 worker 与并行运行互不冲突。
+    """
+
+    @staticmethod
+    def _free_port() -> int:
+        """向内核要一个空闲端口，避免按 PID 推算在多次运行间撞车。"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+    def __init__(self):
+        self.port = self._free_port()
+        self.profile_dir = Path(tempfile.mkdtemp(prefix="soffice_listener_"))
+        self.proc = subprocess.Popen(
+            [
+                "soffice",
+                f"-env:UserInstallation=file://{self.profile_dir.as_posix()}",
+                "--headless", "--norestore", "--nologo", "--nodefault",
+                f"--accept=socket,host=127.0.0.1,port={self.port};urp;",
+            ],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        self._ctx = None
+
+    def _connect(self, timeout: float = 20.0):
+        if self._ctx is not None:
+            return self._ctx
+        local_ctx = uno.getComponentContext()
+        resolver = local_ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_ctx)
+        deadline = time.monotonic() + timeout
+        last_exc = None
+        while time.monotonic() < deadline:
+            try:
+                self._ctx = resolver.resolve(
+                    f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext")
+                return self._ctx
+            except Exception as e:
+                last_exc = e
+                time.sleep(0.5)
+        raise RuntimeError(f"无法连接 LibreOffice 监听进程: {last_exc}")
+
+    @staticmethod
+    def _prop(name, value):
+        p = PropertyValue()
+        p.Name = name
+        p.Value = value
+        return p
+
+    def convert(self, docx_path: Path, out_pdf_path: Path) -> bool:
+        ctx = self._connect()
+        desktop = ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", ctx)
+        in_url = Path(docx_path).resolve().as_uri()
+        out_url = Path(out_pdf_path).resolve().as_uri()
+        doc = desktop.loadComponentFromURL(
+            in_url, "_blank", 0,
+            (self._prop("Hidden", True), self._prop("ReadOnly", True)))
+        if doc is None:
+            return False
+        try:
+            doc.storeToURL(out_url, (self._prop("FilterName", "writer_pdf_Export"),))
+        finally:
+            doc.close(False)
+        return out_pdf_path.exists()
+
+    def shutdown(self):
+        try:
+            self.proc.terminate()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+_soffice_server: Optional[_LibreOfficeServer] = None
+_soffice_server_failed = False
+
+
+def _get_soffice_server() -> Optional[_LibreOfficeServer]:
+    """懒启动本进程的 LibreOffice 监听实例；启动失败后不再重试。"""
+    global _soffice_server, _soffice_server_failed
+    if _soffice_server_failed or not _HAS_UNO:
+        return None
+    if _soffice_server is None:
+        try:
+            _soffice_server = _LibreOfficeServer()
+            atexit.register(_soffice_server.shutdown)
+        except Exception as e:
+            print(f"[WARN] 启动 LibreOffice 监听进程失败: {e}，将回退到逐次调用 soffice。")
+            _soffice_server_failed = True
+            return None
+    return _soffice_server
+
+
+# 批量预转换的结果登记表：{docx 源路径: 生成的 PDF}。进程池在 Linux 上
+# fork 继承该表；spawn 平台拿不到时各 worker 自行走常规转换路径即可
+_preconverted_pdfs: Dict[str, Path] = {}
+
+
+def batch_convert_docx(docx_files: List[Path]):
+    """用一次 soffice 调用把多份 docx 预转换为 PDF，结果登记到 _preconverted_pdfs。
+
+    soffice 冷启动约 1~3 秒，常常超过单个文档的实际转换耗时；把整个
+    批次的文件传给同一次调用可把启动成本摊薄。各项目的 docx 同名
+    （都叫 7.docx），先以唯一前缀复制进暂存目录再统一转换。失败不
+    致命：没有预转换结果的文件仍会走 convert_docx_to_pdf 的常规路径。
+    """
+    soffice = shutil.which("soffice") or shutil.which("libreoffice")
+    if not soffice or len(docx_files) < 2:
+        return
+    workdir = Path(tempfile.mkdtemp(prefix="docx_batch_", dir=_scratch_base()))
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    staged: List[tuple] = []
+    for i, src in enumerate(docx_files):
+        staged_src = workdir / f"{i:03d}_{src.name}"
+        try:
+            shutil.copy2(src, staged_src)
+        except OSError as e:
+            print(f"[WARN] 暂存 {src} 失败: {e}")
+            continue
+        staged.append((src, staged_src, workdir / f"{staged_src.stem}.pdf"))
+    if not staged:
+        return
+    profile_dir = workdir / "profile"
+    cmd = [
+        soffice,
+        f"-env:UserInstallation=file://{profile_dir.as_posix()}",
+        "--headless", "--norestore", "--nologo", "--nodefault",
+        "--convert-to", "pdf", "--outdir", str(workdir),
+    ]
+    cmd.extend(str(s[1]) for s in staged)
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                       timeout=120 + 60 * len(staged))
+    except Exception as e:
+        print(f"[WARN] 批量转换失败，将回退逐个转换: {e}")
+        return
+    converted = 0
+    for src, _staged_src, pdf in staged:
+        if pdf.exists():
+            _preconverted_pdfs[os.fspath(src)] = pdf
+            converted += 1
+    print(f"[INFO] 批量预转换完成: {converted}/{len(staged)} 个 docx")
+
+
 def convert_docx_to_pdf(docx_path: Path, out_pdf_path: Path, dry_run: bool = False) -> bool:
     if dry_run:
         print(f"[DRY] Convert DOCX -> PDF: {docx_path} -> {out_pdf_path}")
         return True
     out_pdf_path.parent.mkdir(parents=True, exist_ok=True)
+    # 批量预转换已出结果的直接取用
+    pre = _preconverted_pdfs.pop(os.fspath(docx_path), None)
+    if pre is not None and pre.exists():
+        try:
+            shutil.move(str(pre), str(out_pdf_path))
+            print(f"[OK] 使用批量预转换结果: {docx_path.name} -> {out_pdf_path.name}")
+            return True
+        except OSError as e:
+            print(f"[WARN] 取用预转换结果失败: {e}，改走常规转换。")
+    # 优先用常驻 LibreOffice 监听实例（免去每次 1~3 秒的冷启动）
+    server = _get_soffice_server()
+    if server is not None:
+        try:
+            if server.convert(docx_path, out_pdf_path):
+                return True
+        except Exception as e:
+            print(f"[WARN] UNO 转换失败: {e}，回退到其他方式...")
     if _HAS_DOCX2PDF:
         try:
+            import docx2pdf
             docx2pdf.convert(str(docx_path), str(out_pdf_path))
             return out_pdf_path.exists()
         except Exception as e:
             print(f"[WARN] docx2pdf 转换失败: {e}，尝试 LibreOffice...")
+    # 每次调用使用独立的 LibreOffice 用户配置目录：共享配置会让并行调用
+    # 直接把任务移交给已运行实例并提前返回成功（而未生成 PDF），
+    # 独立配置既修复该问题，也让进程池里的并行转换成为可能。
+    profile_dir = Path(tempfile.mkdtemp(prefix="soffice_profile_"))
     try:
-        cmd = ["soffice", "--headless", "--convert-to", "pdf", str(docx_path), "--outdir", str(out_pdf_path.parent)]
+        cmd = [
+            "soffice",
+            f"-env:UserInstallation=file://{profile_dir.as_posix()}",
+            "--headless", "--norestore", "--nologo", "--nodefault",
+            "--convert-to", "pdf", str(docx_path), "--outdir", str(out_pdf_path.parent),
+        ]
         subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         generated = out_pdf_path.parent / (docx_path.stem + ".pdf")
         if generated.exists():
@@ -159,7 +476,7 @@ def convert_docx_to_pdf(docx_path: Path, out_pdf_path: Path, dry_run: bool = Fal
                             reader = PdfReader(str(p))
                             for page in reader.pages:
                                 text = page.extract_text() or ""
-                                if any("\u4e00" <= ch <= "\u9fff" for ch in text):
+                                if _CJK_RE.search(text):
                                     return True
                         except Exception:
                             return False
@@ -193,15 +510,68 @@ def convert_docx_to_pdf(docx_path: Path, out_pdf_path: Path, dry_run: bool = Fal
     except subprocess.CalledProcessError as e:
         print(f"[ERROR] LibreOffice 转换失败: {e}")
         return False
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+@functools.lru_cache(maxsize=1)
+def _qpdf_bin() -> Optional[str]:
+    """qpdf 命令行的路径（探测一次后缓存），未安装返回 None。"""
+    return shutil.which("qpdf")
+
+
+def _discard_partial(out_pdf_path: Path) -> None:
+    """合并失败时清掉可能写了一半的输出文件，避免残留损坏的 PDF。"""
+    try:
+        if out_pdf_path.exists():
+            out_pdf_path.unlink()
+    except OSError:
+        pass
 
 
 def merge_pdfs(pdf_paths: List[Path], out_pdf_path: Path, dry_run: bool = False) -> bool:
-    if not _HAS_PYPDF:
-        print("[ERROR] 未安装 pypdf，无法合并 PDF。请运行: pip install pypdf")
+    if not _HAS_PIKEPDF and not _HAS_PYPDF and not _qpdf_bin():
+        print("[ERROR] 未安装 pikepdf/pypdf 且无 qpdf 命令，无法合并 PDF。请运行: pip install pypdf")
         return False
     if dry_run:
         print(f"[DRY] Merge PDFs -> {out_pdf_path}: {[str(p) for p in pdf_paths]}")
         return True
+    # 优先 pikepdf：QPDF 做的是近似流式的对象拷贝，不把每页解析成
+    # Python 对象图，大 PDF 合并比 pypdf 快 5~10 倍且内存平坦。
+    if _HAS_PIKEPDF:
+        try:
+            for p in pdf_paths:
+                if not p.exists():
+                    print(f"[ERROR] 待合并 PDF 不存在: {p}")
+                    return False
+            out_pdf_path.parent.mkdir(parents=True, exist_ok=True)
+            with pikepdf.Pdf.new() as out:
+                for p in pdf_paths:
+                    with pikepdf.Pdf.open(str(p)) as src_pdf:
+                        out.pages.extend(src_pdf.pages)
+                out.save(str(out_pdf_path))
+            return out_pdf_path.exists()
+        except Exception as e:
+            print(f"[WARN] pikepdf 合并失败: {e}，尝试其他方式...")
+    # pikepdf 不可用或失败时试 qpdf 命令行：同一套 QPDF 流式引擎，
+    # 只多付一次进程启动的成本，仍远快于 pypdf 的全量解析
+    if _qpdf_bin():
+        try:
+            missing = [p for p in pdf_paths if not p.exists()]
+            if missing:
+                print(f"[ERROR] 待合并 PDF 不存在: {missing[0]}")
+                return False
+            out_pdf_path.parent.mkdir(parents=True, exist_ok=True)
+            subprocess.run(
+                [_qpdf_bin(), "--empty", "--pages", *[str(p) for p in pdf_paths], "--", str(out_pdf_path)],
+                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if out_pdf_path.exists():
+                return True
+        except Exception as e:
+            print(f"[WARN] qpdf 合并失败: {e}，尝试 pypdf...")
+    if not _HAS_PYPDF:
+        _discard_partial(out_pdf_path)
+        return False
     try:
         writer = PdfWriter()
         for p in pdf_paths:
@@ -217,48 +587,148 @@ def merge_pdfs(pdf_paths: List[Path], out_pdf_path: Path, dry_run: bool = False)
         return out_pdf_path.exists()
     except Exception as e:
         print(f"[ERROR] 合并 PDF 失败: {e}")
+        _discard_partial(out_pdf_path)
         return False
 
 
+_SUBFOLDER_NAMES_1_TO_12 = frozenset(str(i) for i in range(1, 13))
+
+
 def find_subfolders_1_to_12(base_dir: Path) -> List[str]:
     """
     在 base_dir 下（包含其子目录）查找名为 '1'..'12' 的目录，返回缺失名称列表。
+
+    用 os.scandir 做广度优先遍历：凑齐 12 个编号即提前返回，且不深入
+    已命中的编号目录内部（里面不可能再有我们关心的编号）。
     """
     found: Set[str] = set()
     if not base_dir or not base_dir.exists():
         return [str(i) for i in range(1, 13)]
-    for d in base_dir.rglob("*"):
-        if d.is_dir():
-            name = d.name
-            if name.isdigit():
-                try:
-                    n = int(name)
-                    if 1 <= n <= 12:
-                        found.add(name)
-                except Exception:
-                    pass
+
+    pending = deque([os.fspath(base_dir)])
+    while pending:
+        current = pending.popleft()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    if entry.name in _SUBFOLDER_NAMES_1_TO_12:
+                        found.add(entry.name)
+                        if len(found) == 12:
+                            return []
+                    else:
+                        pending.append(entry.path)
+        except OSError:
+            continue
     missing = [str(i) for i in range(1, 13) if str(i) not in found]
     return missing
 
 
-def calculate_md5(file_path: Path) -> str:
-    """计算文件的 MD5 值"""
-    hash_md5 = hashlib.md5()
+# 形如 “X (1)” 的带编号副本名（与 unique_path 生成的命名一致）
+_NUMBERED_SUFFIX_RE = re.compile(r"^(.+) \(\d+\)$")
+
+_PARTIAL_HASH_SAMPLE = 1 << 20  # 头/尾各采样 1 MiB
+
+
+def _partial_hash(file_path: Path, size: int) -> str:
+    """对文件头（及大文件的尾部）采样计算快速哈希，作为全量哈希前的预筛。
+
+    预筛只负责分组、不做最终判定（真正的相等由全量哈希确认），因此
+    未装 xxhash 时用 zlib.crc32 即可——主流构建走 PCLMULQDQ 硬件指令，
+    远快于 MD5，偶发碰撞只是让个别文件多算一次全量哈希。
+    """
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(min(size, _PARTIAL_HASH_SAMPLE))
+            tail = b""
+            if size > 3 * _PARTIAL_HASH_SAMPLE:
+                f.seek(-_PARTIAL_HASH_SAMPLE, 2)
+                tail = f.read(_PARTIAL_HASH_SAMPLE)
+        if _HAS_XXHASH:
+            h = xxhash.xxh3_128(head)
+            h.update(tail)
+            return h.hexdigest()
+        return f"{zlib.crc32(tail, zlib.crc32(head)):08x}"
+    except Exception as e:
+        print(f"[ERROR] 计算采样哈希失败 {file_path}: {e}")
+        return ""
+
+
+def _rolling_hash_py(buf: bytes) -> int:
+    h = 0
+    for b in buf:
+        h = (h * 1099511628211 + b) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+
+if _HAS_NUMBA:
+    @njit(cache=True)
+    def _rolling_hash_nb(arr):  # pragma: no cover - 需要 numba
+        h = numpy.uint64(0)
+        mul = numpy.uint64(1099511628211)
+        for b in arr:
+            h = h * mul + numpy.uint64(b)
+        return h
+
+
+def near_dup_prefix_hash(file_path: Path) -> Optional[int]:
+    """计算文件头 1 MiB 的 64 位多项式滚动哈希（--near-dedup 用）。
+
+    mmap 做零拷贝读取；装了 numba 时内核经 LLVM 自动向量化，
+    否则退回纯 Python 实现（仅在显式开启近似去重时才会走到）。
+    """
     try:
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                sample = mm[:_PARTIAL_HASH_SAMPLE]
+    except (OSError, ValueError):
+        return None
+    if _HAS_NUMBA:
+        return int(_rolling_hash_nb(numpy.frombuffer(sample, dtype=numpy.uint8)))
+    return _rolling_hash_py(sample)
+
+
+# 哈希读取策略的分界与切片大小：64 MiB 以内整读（单次 C 调用），
+# 更大的走 mmap 并按 16 MiB 切片喂哈希，平衡峰值内存与调用次数
+_MMAP_THRESHOLD = 64 << 20
+_MMAP_SLICE = 16 << 20
+
+
+def calculate_content_hash(file_path: Path) -> str:
+    """计算文件内容哈希（去重用，非加密用途）。
+
+    优先使用 xxhash 的 xxh3_128；未安装时退回 hashlib.sha256——OpenSSL
+    在新一代 x86/ARM 上走 SHA-NI 硬件指令，比 MD5 更快且无碰撞包袱。
+    小文件一次 read() 整体喂给哈希（单次 C 调用）；超过 64 MiB 的文件
+    改用 mmap，按 16 MiB 的 memoryview 切片零拷贝更新，避免 Python 层
+    读循环和重复拷贝。sha256 回退在 3.11+ 直接走 hashlib.file_digest：
+    readinto 固定缓冲的读哈希循环整个在 C 层完成，且不做整文件分配。
+    """
+    h = xxhash.xxh3_128() if _HAS_XXHASH else hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            if not _HAS_XXHASH and hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, hashlib.sha256).hexdigest()
+            size = os.fstat(f.fileno()).st_size
+            if size <= _MMAP_THRESHOLD:
+                h.update(f.read())
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as mv:
+                        for off in range(0, size, _MMAP_SLICE):
+                            h.update(mv[off:off + _MMAP_SLICE])
+        return h.hexdigest()
     except Exception as e:
-        print(f"[ERROR] 计算 MD5 失败 {file_path}: {e}")
+        print(f"[ERROR] 计算内容哈希失败 {file_path}: {e}")
         return ""
 
 
-def remove_duplicate_files(output_dir: Path, dry_run: bool = False):
+def remove_duplicate_files(output_dir: Path, dry_run: bool = False, near_dedup: bool = False):
     """
     对输出目录中的 PDF 和图片做去重：
-    - 若 MD5 相同，仅保留不带 (1) 等后缀者
-    - 额外：若存在 “X.ext” 和 “X (n).ext”，无论 MD5 是否一致，一律删除 “X (n).ext”
+    - 若内容哈希相同，仅保留不带 (1) 等后缀者
+    - 额外：若存在 “X.ext” 和 “X (n).ext”，无论哈希是否一致，一律删除 “X (n).ext”
     """
     if not output_dir.exists():
         return
@@ -268,20 +738,56 @@ def remove_duplicate_files(output_dir: Path, dry_run: bool = False):
     # 目标扩展名：PDF + 图片
     target_exts = {".pdf"} | IMAGE_EXTENSIONS
     
-    md5_dict: Dict[str, List[Path]] = {}
-    # 扫描所有目标文件
-    all_files = [
-        p for p in output_dir.iterdir() 
-        if p.is_file() and p.suffix.lower() in target_exts
-    ]
+    # 一次 os.scandir 列出目标文件，后续两个去重阶段共用这份列表；
+    # DirEntry.stat() 复用目录扫描时缓存的结果，避免每文件额外的 stat 系统调用。
+    entries: List[os.DirEntry] = []
+    with os.scandir(output_dir) as it:
+        for e in it:
+            if e.is_file(follow_symlinks=False) and os.path.splitext(e.name)[1].lower() in target_exts:
+                entries.append(e)
+
+    # 三级预筛：大小 -> 采样哈希 -> 全量哈希。大小唯一的文件完全不读内容。
+    size_groups: Dict[int, List[Path]] = {}
+    for e in entries:
+        try:
+            size_groups.setdefault(e.stat().st_size, []).append(Path(e.path))
+        except OSError as exc:
+            print(f"  [ERROR] 读取文件大小失败 {e.name}: {exc}")
+
+    full_hash_candidates: List[Path] = []
+    empty_files: List[Path] = []
+    for size, group in size_groups.items():
+        if len(group) < 2:
+            continue
+        if size == 0:
+            # 空文件内容必然相同，一个字节都不用读
+            empty_files.extend(group)
+            continue
+        partial_groups: Dict[str, List[Path]] = {}
+        for f in group:
+            ph = _partial_hash(f, size)
+            if ph:
+                partial_groups.setdefault(ph, []).append(f)
+        for candidates in partial_groups.values():
+            if len(candidates) >= 2:
+                full_hash_candidates.extend(candidates)
+
+    # 预筛后仍要全量哈希的文件交给线程池：hashlib/xxhash 在计算期间
+    # 释放 GIL，文件读取又是 I/O 等待，线程间读与算相互重叠
+    hash_dict: Dict[str, List[Path]] = {}
+    if len(empty_files) >= 2:
+        hash_dict["<empty>"] = empty_files
+    if len(full_hash_candidates) >= 2:
+        workers = min(8, os.cpu_count() or 1, len(full_hash_candidates))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+            digests = ex.map(calculate_content_hash, full_hash_candidates)
+        for f, digest in zip(full_hash_candidates, digests):
+            if digest:
+                hash_dict.setdefault(digest, []).append(f)
 
-    for f in all_files:
-        md5 = calculate_md5(f)
-        if md5:
-            md5_dict.setdefault(md5, []).append(f)
-    
     deleted_count = 0
-    for md5, files in md5_dict.items():
+    deleted_names: Set[str] = set()
+    for digest, files in hash_dict.items():
         if len(files) > 1:
             files_sorted = sorted(files, key=lambda f: (
                 " (" in f.stem,
@@ -291,38 +797,52 @@ def remove_duplicate_files(output_dir: Path, dry_run: bool = False):
             keep_file = files_sorted[0]
             for dup in files_sorted[1:]:
                 if dry_run:
-                    print(f"  [DRY] 删除重复(MD5相同): {dup.name} (保留 {keep_file.name})")
+                    print(f"  [DRY] 删除重复(内容相同): {dup.name} (保留 {keep_file.name})")
                 else:
                     try:
                         dup.unlink()
-                        print(f"  [OK] 已删除重复(MD5相同): {dup.name}")
+                        deleted_names.add(dup.name)
+                        print(f"  [OK] 已删除重复(内容相同): {dup.name}")
                         deleted_count += 1
                     except Exception as e:
                         print(f"  [ERROR] 删除失败 {dup.name}: {e}")
-    
-    # 再次扫描以处理文件名模式 (X.ext vs X (n).ext)
-    for f in output_dir.iterdir():
-        if not f.is_file() or f.suffix.lower() not in target_exts:
+
+    # 第二阶段复用同一份列表处理文件名模式 (X.ext vs X (n).ext)，跳过已删除者。
+    # 原始文件是否存在用一次性构建的名字集合判断（集合查找，无系统调用）。
+    existing_names = {e.name for e in entries} - deleted_names
+    for e in entries:
+        if e.name in deleted_names:
             continue
-            
-        if " (" in f.stem and f.stem.endswith(")"):
-            # 尝试构造原始文件名
-            try:
-                base_stem = f.stem.rsplit(' (', 1)[0]
-                base_file = output_dir / (base_stem + f.suffix)
-                if base_file.exists():
-                    if dry_run:
-                        print(f"  [DRY] 删除带后缀文件: {f.name} (保留 {base_file.name})")
-                    else:
-                        try:
-                            f.unlink()
-                            print(f"  [OK] 已删除带后缀文件: {f.name}")
-                            deleted_count += 1
-                        except Exception as e:
-                            print(f"  [ERROR] 删除失败 {f.name}: {e}")
-            except Exception:
-                pass
+        stem, suffix = os.path.splitext(e.name)
+
+        m = _NUMBERED_SUFFIX_RE.match(stem)
+        if m:
+            base_name = m.group(1) + suffix
+            if base_name in existing_names:
+                if dry_run:
+                    print(f"  [DRY] 删除带后缀文件: {e.name} (保留 {base_name})")
+                else:
+                    try:
+                        os.unlink(e.path)
+                        print(f"  [OK] 已删除带后缀文件: {e.name}")
+                        deleted_count += 1
+                    except Exception as exc:
+                        print(f"  [ERROR] 删除失败 {e.name}: {exc}")
     
+    # 近似重复检测（仅报告，不删除）：按头部 1 MiB 滚动哈希分组，
+    # 用于发现内容几乎一致、仅尾部元数据不同的 PDF
+    if near_dedup:
+        prefix_groups: Dict[int, List[str]] = {}
+        for e in entries:
+            if e.name in deleted_names:
+                continue
+            ph = near_dup_prefix_hash(Path(e.path))
+            if ph is not None:
+                prefix_groups.setdefault(ph, []).append(e.name)
+        for names in prefix_groups.values():
+            if len(names) > 1:
+                print(f"  [INFO] 疑似近似重复（头部哈希一致）: {names}")
+
     if deleted_count > 0:
         print(f"[INFO] 共删除 {deleted_count} 个重复文件")
     else:
@@ -345,16 +865,270 @@ def _decode_zip_filename(info: zipfile.ZipInfo, extra_encodings: Optional[List[s
     return info.filename
 
 
+# 单条目超过该大小不走整段解压，避免一次性占用过多内存
+_LIBDEFLATE_MAX_ENTRY = 64 << 20
+
+
+def _local_data_offset(fh, info: zipfile.ZipInfo) -> Optional[int]:
+    """返回条目压缩数据在 zip 文件中的起始偏移，解析失败返回 None。
+
+    本地文件头的文件名/扩展区长度可能与中央目录不同，必须现场解析。
+    """
+    fh.seek(info.header_offset)
+    header = fh.read(30)
+    if len(header) != 30 or header[:4] != b"PK\x03\x04":
+        return None
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    return info.header_offset + 30 + name_len + extra_len
+
+
+def _read_entry_libdeflate(fh, info: zipfile.ZipInfo) -> Optional[bytes]:
+    """用 libdeflate 一次性解压一个 DEFLATE 条目，任何异常回退 None。
+
+    zipfile 走 zlib 流式解压、按 64KiB 块循环；libdeflate 整段 inflate
+    省掉流状态机与分块开销。解压后校验 CRC 保证与 stdlib 路径等价。
+    """
+    try:
+        data_offset = _local_data_offset(fh, info)
+        if data_offset is None:
+            return None
+        fh.seek(data_offset)
+        raw = fh.read(info.compress_size)
+        if len(raw) != info.compress_size:
+            return None
+        data = deflate.deflate_decompress(raw, info.file_size)
+        if zlib.crc32(data) != info.CRC:
+            return None
+        return data
+    except Exception:
+        return None
+
+
+def _sendfile_entry(fh, info: zipfile.ZipInfo, target: Path) -> bool:
+    """STORED 条目经 sendfile 内核态拷贝到 target，不可用或失败返回 False。
+
+    未压缩条目的字节可以原样落盘，没必要流经用户态缓冲区各拷贝一次；
+    sendfile 让内核直接在页缓存间搬运。调用方必须保证 fh 是真实磁盘
+    文件：对 SpooledTemporaryFile 取 fileno() 会触发 rollover()，把
+    整个内存中的压缩包悄悄写到磁盘。
+    """
+    try:
+        offset = _local_data_offset(fh, info)
+        if offset is None:
+            return False
+        src_fd = fh.fileno()
+        with open(target, "wb") as dst:
+            remaining = info.file_size
+            while remaining:
+                sent = os.sendfile(dst.fileno(), src_fd, offset, remaining)
+                if sent <= 0:
+                    return False
+                offset += sent
+                remaining -= sent
+    except Exception:
+        return False
+    # CRC 校验：sendfile 在内核态搬运，没法顺路计算，落盘后读回校验
+    # （页缓存还热）。与 zipfile/libdeflate 路径保持同等的完整性保证。
+    crc = 0
+    try:
+        with open(target, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                crc = zlib.crc32(chunk, crc)
+    except OSError:
+        return False
+    if crc != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+    return True
+
+
+def _extract_entry(zf: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path,
+                   file_backed: bool = False):
+    """将单个文件条目写到 target，优先 libdeflate 整段解压。
+
+    file_backed 表明压缩包句柄是真实磁盘文件；只有此时才尝试 sendfile
+    零拷贝（流式下载的 SpooledTemporaryFile 取 fd 会被迫整包落盘）。
+    """
+    data = None
+    if (_HAS_LIBDEFLATE and info.compress_type == zipfile.ZIP_DEFLATED
+            and 0 < info.file_size < _LIBDEFLATE_MAX_ENTRY):
+        data = _read_entry_libdeflate(zf.fp, info)
+    if data is not None:
+        with open(target, "wb") as dst:
+            dst.write(data)
+    elif (file_backed and info.compress_type == zipfile.ZIP_STORED
+          and info.file_size > 0
+          and hasattr(os, "sendfile") and _sendfile_entry(zf.fp, info, target)):
+        pass
+    else:
+        # 1 MiB 缓冲把 Python 层读写循环的往返次数压到原来的 1/16
+        with zf.open(info) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, length=1 << 20)
+
+
+# 条目数达到该值才值得为并行解压付出线程与句柄开销
+_PARALLEL_EXTRACT_MIN_ENTRIES = 32
+
+
+def _extract_entries_parallel(archive_path: Path, jobs: List[tuple]):
+    """多线程解压 [(ZipInfo, 目标路径)] 列表。
+
+    zlib/libdeflate 在 inflate 期间释放 GIL，各条目又是独立的 DEFLATE
+    流，线程池可接近线性扩展。每个线程持有自己的 ZipFile 句柄（独立
+    文件描述符，互不抢 seek 位置），条目按 file_size 贪心装箱均衡负载。
+    """
+    workers = min(os.cpu_count() or 2, 8, len(jobs))
+    bins: List[List[tuple]] = [[] for _ in range(workers)]
+    bin_sizes = [0] * workers
+    for job in sorted(jobs, key=lambda j: j[0].file_size, reverse=True):
+        i = bin_sizes.index(min(bin_sizes))
+        bins[i].append(job)
+        bin_sizes[i] += job[0].file_size
+
+    def _run(chunk: List[tuple]):
+        with zipfile.ZipFile(archive_path, "r") as zf:
+            for info, target in chunk:
+                _extract_entry(zf, info, target, file_backed=True)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(_run, b) for b in bins if b]
+        for fut in concurrent.futures.as_completed(futures):
+            fut.result()
+
+
+# 解压内容不超过该大小时尝试放进内存盘，省掉写盘再读回的往返
+_SMALL_ARCHIVE_RAM_LIMIT = 256 << 20
+
+
+def _scratch_base(expected_size: Optional[int] = None) -> Optional[str]:
+    """返回 RAM 盘（tmpfs）作为临时目录的父路径，不适用时返回 None。
+
+    /tmp 在不少发行版上落在真实磁盘：解压后再扫描等于同一批字节写盘
+    又读回。/dev/shm 让写入-处理-回收整条链路以内存带宽运行。预估
+    大小未知时按小压缩包上限估算；最多占用一半空闲空间，给处理过程
+    中产生的合并 PDF 等产物留余量。
+    """
+    shm = "/dev/shm"
+    if not os.path.isdir(shm):
+        return None
+    try:
+        free = shutil.disk_usage(shm).free
+    except OSError:
+        return None
+    if expected_size is None:
+        expected_size = _SMALL_ARCHIVE_RAM_LIMIT
+    if expected_size * 2 > free:
+        return None
+    return shm
+
+
+def _ram_extract_dir(archive_path: Path) -> Optional[str]:
+    """小压缩包返回 RAM 盘作为解压父目录，不适用时返回 None。
+
+    整个处理流程（soffice 子进程、文件移动）都需要真实路径，无法完全
+    在内存中虚拟化；tmpfs 是保留真实路径语义下最接近的做法。
+    """
+    try:
+        with zipfile.ZipFile(archive_path, "r") as zf:
+            total = sum(zi.file_size for zi in zf.infolist())
+    except Exception:
+        return None
+    if total > _SMALL_ARCHIVE_RAM_LIMIT:
+        return None
+    return _scratch_base(total)
+
+
+def _zip_name_is_safe(name: str) -> bool:
+    """无需 resolve 的条目名安全检查：拒绝绝对路径、盘符与 .. 穿越。"""
+    normalized = name.replace("\\", "/")
+    if normalized.startswith("/") or ":" in normalized.split("/", 1)[0]:
+        return False
+    return ".." not in normalized.split("/")
+
+
 def extract_archive(archive_path: Path, dest_dir: Path) -> Path:
-    """解压 zip 压缩包到 dest_dir 并返回作为 root 的目录。"""
+    """解压 zip 压缩包到 dest_dir 并返回作为 root 的目录。
+
+    必须全量落盘：项目识别依赖目录结构探测，处理阶段的 soffice 子进程
+    与跨目录移动都要求真实路径，无法从打开的 ZipFile 直接虚拟供给；
+    dest_dir 尽量放 tmpfs（见 _ram_extract_dir）来压低落盘成本。
+    """
     if not archive_path.exists() or not archive_path.is_file():
         raise FileNotFoundError(f"压缩包不存在: {archive_path}")
     dest_dir.mkdir(parents=True, exist_ok=True)
     dest_root = dest_dir.resolve()
 
-    with zipfile.ZipFile(archive_path, "r") as zf:
-        for info in zf.infolist():
-            decoded_name = _decode_zip_filename(info)
+    # 读一次文件头识别格式：不靠扩展名猜、不靠 BadZipFile 异常试错，
+    # 误传的 tar/gzip/7z 能立刻得到明确的报错。句柄复用，seek 回零后
+    # 直接交给 ZipFile，不重复打开
+    fh = open(archive_path, "rb")
+    try:
+        _check_zip_magic(fh, archive_path)
+        _extract_zip(fh, archive_path, dest_root)
+    finally:
+        fh.close()
+    return _extraction_root(dest_root)
+
+
+def extract_archive_stream(fh, dest_dir: Path, label: str = "<stream>") -> Path:
+    """把 zip 内容的可 seek 文件对象解压到 dest_dir 并返回 root 目录。
+
+    供流式下载直接衔接解压使用（内容可能只在内存/匿名文件里，没有
+    磁盘路径）；没有路径可重开，条目解压保持单线程。
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    dest_root = dest_dir.resolve()
+    _check_zip_magic(fh, label)
+    _extract_zip(fh, None, dest_root)
+    return _extraction_root(dest_root)
+
+
+def _check_zip_magic(fh, label):
+    """校验文件头是 zip，否则抛出说明实际格式的 ValueError。"""
+    fh.seek(0)
+    head = fh.read(512)
+    if head[:2] != b"PK":
+        if head[:2] == b"\x1f\x8b":
+            kind = "gzip/tar.gz"
+        elif head[257:262] == b"ustar":
+            kind = "tar"
+        elif head[:6] == b"7z\xbc\xaf\x27\x1c":
+            kind = "7z"
+        else:
+            kind = "未知格式"
+        raise ValueError(f"仅支持 zip 压缩包，检测到 {kind}: {label}")
+    fh.seek(0)
+
+
+def _extraction_root(dest_root: Path) -> Path:
+    # 若解压后只有一个顶层目录，则返回该目录；否则返回 dest_root 本身
+    top_level_dirs = [p for p in dest_root.iterdir() if p.is_dir()]
+    if len(top_level_dirs) == 1:
+        return top_level_dirs[0]
+    return dest_root
+
+
+def _extract_zip(fh, archive_path: Optional[Path], dest_root: Path):
+    """把已验证为 zip 的打开句柄解压到 dest_root。
+
+    archive_path 为 None 表示内容没有磁盘路径（流式下载），并行解压
+    需要按路径重开句柄，此时退回单线程。
+    """
+    with zipfile.ZipFile(fh) as zf:
+        infos = zf.infolist()
+        decoded_names = [_decode_zip_filename(i) for i in infos]
+
+        # 条目名全部无需修正且路径安全时整体交给 extractall：复用同一个
+        # 解压器并批量建目录，多小文件压缩包可快约一倍。libdeflate 可用
+        # 或条目多到值得并行时仍走逐条目路径。
+        if (not _HAS_LIBDEFLATE
+                and len(infos) < _PARALLEL_EXTRACT_MIN_ENTRIES
+                and all(n == i.filename for i, n in zip(infos, decoded_names))
+                and all(_zip_name_is_safe(n) for n in decoded_names)):
+            zf.extractall(path=dest_root)
+            infos = []
+
+        file_jobs: List[tuple] = []
+        for info, decoded_name in zip(infos, decoded_names):
             target_path = dest_root / Path(decoded_name)
             try:
                 target_resolved = target_path.resolve()
@@ -374,18 +1148,30 @@ def extract_archive(archive_path: Path, dest_dir: Path) -> Path:
                 continue
 
             target_resolved.parent.mkdir(parents=True, exist_ok=True)
-            with zf.open(info) as src, open(target_resolved, "wb") as dst:
-                shutil.copyfileobj(src, dst)
+            file_jobs.append((info, target_resolved))
+
+        # 目录结构已建好，payload 写出彼此独立，可并行
+        if archive_path is not None and len(file_jobs) >= _PARALLEL_EXTRACT_MIN_ENTRIES:
+            _extract_entries_parallel(archive_path, file_jobs)
+        else:
+            for info, target in file_jobs:
+                _extract_entry(zf, info, target, file_backed=archive_path is not None)
 
-    # 若解压后只有一个顶层目录，则返回该目录；否则返回 dest_dir 本身
-    top_level_dirs = [p for p in dest_root.iterdir() if p.is_dir()]
-    if len(top_level_dirs) == 1:
-        return top_level_dirs[0]
-    return dest_root
+
+# 本身已是压缩格式的文件直接存储，省掉对其再做 DEFLATE 的无谓 CPU
+_STORED_SUFFIXES = frozenset({".pdf", ".zip", ".jpg", ".jpeg", ".png"})
+
+# 小于该大小的可压缩文件整读后单次压缩，绕过流式压缩器的分块开销
+_ZIP_SINGLE_SHOT_LIMIT = 8 << 20
 
 
 def zip_outputs(outputs: List[Path], zip_path: Path, dry_run: bool = False):
-    """将所有项目的输出目录打包为 zip。"""
+    """将所有项目的输出目录打包为 zip。
+
+    打出的 zip 只是回传 WebDAV 的中转产物：对可压缩文件用 DEFLATE 级别 1
+    （比默认级别 6 省约 2/3 的 CPU，体积几乎不变），对 PDF/图片等
+    已压缩格式直接 ZIP_STORED。
+    """
     if not outputs:
         print("[WARN] 没有可打包的输出目录，跳过压缩。")
         return
@@ -393,16 +1179,60 @@ def zip_outputs(outputs: List[Path], zip_path: Path, dry_run: bool = False):
     if dry_run:
         print(f"[DRY] Would zip outputs -> {zip_path} : {[str(o) for o in outputs]}")
         return
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for out_dir in outputs:
-            if not out_dir.exists():
-                print(f"[WARN] 输出目录不存在，跳过: {out_dir}")
-                continue
-            proj_label = out_dir.parent.name
-            for file_path in out_dir.rglob("*"):
-                if file_path.is_file():
-                    arcname = f"{proj_label}/{file_path.relative_to(out_dir)}"
-                    zf.write(file_path, arcname)
+    # 先枚举出平坦的任务列表：(路径, 归档名, 压缩方式, 大小)
+    jobs: List[tuple] = []
+    for out_dir in outputs:
+        if not out_dir.exists():
+            print(f"[WARN] 输出目录不存在，跳过: {out_dir}")
+            continue
+        proj_label = out_dir.parent.name
+        for dirpath, _dirnames, filenames in os.walk(out_dir):
+            for fn in filenames:
+                fp = os.path.join(dirpath, fn)
+                arcname = f"{proj_label}/{os.path.relpath(fp, out_dir)}"
+                comp = zipfile.ZIP_STORED if os.path.splitext(fn)[1].lower() in _STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+                try:
+                    size = os.path.getsize(fp)
+                except OSError as e:
+                    print(f"[WARN] 读取文件信息失败，跳过: {fp}: {e}")
+                    continue
+                jobs.append((fp, arcname, comp, size))
+
+    # zip 中央目录要求串行写入，压缩本身无法多进程拆分（写侧只有一个
+    # 句柄），但读盘可以预跑：线程池按有界窗口预读小文件内容，主线程
+    # 专心压缩写入，相邻文件的 I/O 与 DEFLATE 相互重叠。
+    # 小文件整读 + writestr 单次压缩（省掉 8KiB 分块往返），大文件
+    # 不整读进内存，仍走流式 zf.write。
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED,
+                         compresslevel=1, allowZip64=True) as zf:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            prefetch: deque = deque()
+            idx = 0
+
+            def _fill_window():
+                nonlocal idx
+                while idx < len(jobs) and len(prefetch) < 4:
+                    job = jobs[idx]
+                    fut = pool.submit(Path(job[0]).read_bytes) if job[3] <= _ZIP_SINGLE_SHOT_LIMIT else None
+                    prefetch.append((job, fut))
+                    idx += 1
+
+            _fill_window()
+            while prefetch:
+                (fp, arcname, comp, _size), fut = prefetch.popleft()
+                if fut is None:
+                    zf.write(fp, arcname, compress_type=comp)
+                else:
+                    try:
+                        data = fut.result()
+                    except OSError as e:
+                        print(f"[WARN] 读取失败，跳过: {fp}: {e}")
+                        _fill_window()
+                        continue
+                    zinfo = zipfile.ZipInfo.from_file(fp, arcname)
+                    zinfo.compress_type = comp
+                    zf.writestr(zinfo, data, compresslevel=1)
+                _fill_window()
     print(f"[OK] 已生成压缩包: {zip_path}")
 
 
@@ -417,6 +1247,24 @@ class WebDAVClient:
     def __init__(self, base_url: str, username: Optional[str] = None, password: Optional[str] = None):
         self.base_url = _ensure_trailing_slash(base_url)
         self.auth = (username, password) if username or password else None
+        # 复用一个 Session：keep-alive 让整批请求共享 TCP/TLS 连接，
+        # 免去每个 PROPFIND/GET/PUT/DELETE 的握手开销
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        # 只自动重试只读方法：连接中断后重放 PUT 会把已消费了一半的
+        # 请求体按原 Content-Length 重发（截断的上传被当成功），重放
+        # DELETE 也非幂等于业务。上传/删除失败由调用方整体重来。
+        _retry_methods = frozenset({"GET", "HEAD", "OPTIONS", "PROPFIND"})
+        try:
+            retry = Retry(total=3, backoff_factor=0.3, allowed_methods=_retry_methods)
+        except TypeError:  # 旧版 urllib3 的参数名
+            retry = Retry(total=3, backoff_factor=0.3, method_whitelist=_retry_methods)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
 
     def _build_url(self, remote_name: str) -> str:
         quoted = quote(remote_name)
@@ -429,36 +1277,27 @@ class WebDAVClient:
 <d:propfind xmlns:d='DAV:'>
   <d:allprop/>
 </d:propfind>"""
+        # 流式解析 multistatus 响应：每个 <d:href> 处理完即丢弃，
+        # 内存 O(1)，解析与网络传输重叠；非 .zip 条目在 unquote 前就被过滤
+        archives: List[str] = []
         try:
-            resp = requests.request("PROPFIND", self.base_url, data=body, headers=headers, auth=self.auth)
+            resp = self.session.request("PROPFIND", self.base_url, data=body, headers=headers, stream=True)
             resp.raise_for_status()
+            resp.raw.decode_content = True
+            iterparse = _lxml_etree.iterparse if _HAS_LXML else ET.iterparse
+            for _event, elem in iterparse(resp.raw, events=("end",)):
+                if elem.tag == "{DAV:}href" and elem.text:
+                    name = elem.text.rstrip("/")
+                    if name:
+                        last = name.split("/")[-1]
+                        if last.lower().endswith(".zip"):
+                            fname = unquote(last)
+                            if processed_suffix not in Path(fname).stem:
+                                archives.append(fname)
+                elem.clear()
         except Exception as e:
             print(f"[ERROR] WebDAV 列表请求失败: {e}")
             return []
-
-        try:
-            root = ET.fromstring(resp.content)
-        except Exception as e:
-            print(f"[ERROR] 解析 WebDAV 列表响应失败: {e}")
-            return []
-
-        archives: List[str] = []
-        for resp_el in root.findall(".//{DAV:}response"):
-            href_el = resp_el.find("{DAV:}href")
-            if href_el is None or not href_el.text:
-                continue
-            name = href_el.text
-            name = name.rstrip("/")
-            if not name:
-                continue
-            parts = name.split("/")
-            if not parts:
-                continue
-            fname = unquote(parts[-1])
-            if not fname or fname.endswith("/"):
-                continue
-            if fname.lower().endswith(".zip") and processed_suffix not in Path(fname).stem:
-                archives.append(fname)
         return archives
 
     def download_file(self, remote_name: str, local_path: Path, dry_run: bool = False) -> bool:
@@ -467,7 +1306,7 @@ class WebDAVClient:
             print(f"[DRY] WebDAV 下载: {url} -> {local_path}")
             return True
         try:
-            with requests.get(url, auth=self.auth, stream=True) as r:
+            with self.session.get(url, stream=True) as r:
                 r.raise_for_status()
                 local_path.parent.mkdir(parents=True, exist_ok=True)
                 with open(local_path, "wb") as f:
@@ -480,14 +1319,40 @@ class WebDAVClient:
             print(f"[ERROR] 下载失败 {remote_name}: {e}")
             return False
 
+    def download_spooled(self, remote_name: str):
+        """下载远端文件到 SpooledTemporaryFile，失败返回 None。
+
+        压缩包不落盘即可直接交给 extract_archive_stream：256 MiB 以内
+        全程留在内存，超出才溢写到磁盘，省掉整包先写后读的一个来回。
+        """
+        url = self._build_url(remote_name)
+        try:
+            spooled = tempfile.SpooledTemporaryFile(max_size=256 << 20)
+            with self.session.get(url, stream=True) as r:
+                r.raise_for_status()
+                for chunk in r.iter_content(chunk_size=1 << 20):
+                    if chunk:
+                        spooled.write(chunk)
+            spooled.seek(0)
+            print(f"[OK] 已从 WebDAV 下载: {remote_name}")
+            return spooled
+        except Exception as e:
+            print(f"[ERROR] 下载失败 {remote_name}: {e}")
+            return None
+
     def upload_file(self, local_path: Path, remote_name: str, dry_run: bool = False) -> bool:
         url = self._build_url(remote_name)
         if dry_run:
             print(f"[DRY] WebDAV 上传: {local_path} -> {url}")
             return True
         try:
+            # 直接把打开的文件对象交给 requests：它用 fstat 得出
+            # Content-Length 并分块写 socket，峰值内存与文件大小无关。
+            # 不能自己配 Content-Length + 生成器——那会同时发出
+            # Content-Length 和 Transfer-Encoding: chunked，合规服务器
+            # 按 chunked 解析未分帧的包体，要么挂起要么当走私请求拒掉
             with open(local_path, "rb") as f:
-                resp = requests.put(url, data=f, auth=self.auth)
+                resp = self.session.put(url, data=f)
             resp.raise_for_status()
             print(f"[OK] 已上传到 WebDAV: {remote_name}")
             return True
@@ -501,7 +1366,7 @@ class WebDAVClient:
             print(f"[DRY] WebDAV 删除: {url}")
             return True
         try:
-            resp = requests.request("DELETE", url, auth=self.auth)
+            resp = self.session.request("DELETE", url)
             resp.raise_for_status()
             print(f"[OK] 已删除 WebDAV 文件: {remote_name}")
             return True
@@ -514,22 +1379,25 @@ class WebDAVClient:
 
 
 def get_first_chinese_char(s: str):
-    for ch in s:
-        if "\u4e00" <= ch <= "\u9fff":
-            return ch
-    return None
+    m = _CJK_RE.search(s)
+    return m.group(0) if m else None
 
 
+@functools.lru_cache(maxsize=8192)
 def pinyin_initial_of_first_chinese(s: str) -> str:
     """
     返回字符串中第一个汉字的拼音首字母（A-Z）。
     若无法得到首字母，则返回 '{'（在 ASCII 排序中位于 Z 之后，用于排到最后）。
+
+    结果按字符串缓存：批次内同名专家/供应商目录反复出现，
+    避免每次都查 pypinyin 的 CJK 字典。
     """
     ch = get_first_chinese_char(s or "")
     if not ch:
         return "{"
     if _HAS_PYPINYIN:
         try:
+            lazy_pinyin, Style = _pypinyin()
             initials = lazy_pinyin(ch, style=Style.FIRST_LETTER)
             if initials and initials[0]:
                 c = initials[0][0].upper()
@@ -548,11 +1416,10 @@ def sort_dirs_by_pinyin(dirs: List[Path]) -> List[Path]:
     if not dirs:
         return dirs
 
-    def sort_key(p: Path):
-        initial = pinyin_initial_of_first_chinese(p.name)
-        return (initial, p.name)
-
-    return sorted(dirs, key=sort_key)
+    # 预先算好 (首字母, 名称) 装饰元组再排序，排序过程不再回调 pypinyin
+    decorated = [(pinyin_initial_of_first_chinese(p.name), p.name, p) for p in dirs]
+    decorated.sort(key=lambda t: (t[0], t[1]))
+    return [t[2] for t in decorated]
 
 
 # 辅助函数：安全获取编号子目录，存在则返回，不存在则返回 None
@@ -561,6 +1428,63 @@ def get_sub_dir(base_dir: Path, n: int) -> Path:
     return d if (d.exists() and d.is_dir()) else None
 
 
+def _scandir_walk(root, prune: Optional[Set[str]] = None):
+    """迭代式 os.scandir 深度遍历，产出文件对应的 DirEntry。
+
+    替代 pathlib.rglob：不为中间目录构造 Path 对象，目录/文件类型判断
+    复用 dirent 缓存（每个条目约 1 次系统调用而非 3 次）。prune 中的
+    目录名不深入。
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        if prune is None or e.name not in prune:
+                            stack.append(e.path)
+                    else:
+                        yield e
+        except OSError:
+            continue
+
+
+def _fast_rmtree(path) -> None:
+    """自底向上直删临时树。
+
+    shutil.rmtree 对每个条目都带一层错误回调和额外 stat；临时目录的
+    内容是我们自己写进去的，直接 unlink/rmdir 即可。任何意外（权限、
+    符号链接目录等）整体回退到 shutil.rmtree 兜底。
+    """
+    try:
+        for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+            for fn in filenames:
+                os.unlink(os.path.join(dirpath, fn))
+            for dn in dirnames:
+                full = os.path.join(dirpath, dn)
+                try:
+                    os.rmdir(full)
+                except OSError:
+                    os.unlink(full)  # 目录符号链接在 dirnames 里，rmdir 会失败
+        os.rmdir(path)
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def snapshot(d: Path) -> Dict[str, os.DirEntry]:
+    """一次 os.scandir 把目录内容物化为 {名称: DirEntry}。
+
+    后续的存在性/类型判断全部在内存中回答，省掉 process_project 里
+    成片的 exists()/is_dir() 系统调用。
+    """
+    try:
+        with os.scandir(d) as it:
+            return {e.name: e for e in it}
+    except OSError:
+        return {}
+
+
 # ----------------- 处理单个项目 -----------------
 
 
@@ -590,14 +1514,20 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
     proj = proj_root
 
     print(f"\n--- 处理项目: {proj} ---")
-    
+
+    # 项目根目录只扫一次，之后的存在性/类型判断都查快照
+    proj_snapshot = snapshot(proj)
+
     # 确定 base12_dir：优先 proj/12/开评标资料，其次 proj/12
-    base12_candidate = proj / REQUIRED_SUBDIR / KAIPING_DIR_NAME
-    if base12_candidate.exists() and base12_candidate.is_dir():
-        base12_dir = base12_candidate
-    else:
-        base12_fallback = proj / REQUIRED_SUBDIR
-        base12_dir = base12_fallback if base12_fallback.exists() and base12_fallback.is_dir() else None
+    base12_dir = None
+    entry_12 = proj_snapshot.get(REQUIRED_SUBDIR)
+    if entry_12 is not None and entry_12.is_dir(follow_symlinks=False):
+        sub12_snapshot = snapshot(proj / REQUIRED_SUBDIR)
+        kaiping = sub12_snapshot.get(KAIPING_DIR_NAME)
+        if kaiping is not None and kaiping.is_dir(follow_symlinks=False):
+            base12_dir = proj / REQUIRED_SUBDIR / KAIPING_DIR_NAME
+        else:
+            base12_dir = proj / REQUIRED_SUBDIR
 
     if base12_dir is None:
         print(f"[WARN] 项目中未找到 '{REQUIRED_SUBDIR}' 或 '{REQUIRED_SUBDIR}/{KAIPING_DIR_NAME}'，将以 proj/1 作为默认输出目录并仅执行根级处理。")
@@ -626,30 +1556,21 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
     if not dry_run:
         tmpdir.mkdir(parents=True, exist_ok=True)
 
-    # 根目录处理：移动并按需求改名
+    # 根目录处理：移动并按需求改名（存在性查快照，不再逐个 stat）
     for name in MOVE_FILES_TO_OUTPUT:
         src = proj / name
-        if not src.exists():
+        entry = proj_snapshot.get(name)
+        if entry is None or not entry.is_file(follow_symlinks=False):
             print(f"[WARN] 未找到待移动文件: {src}")
             continue
-        if name == "6.pdf":
-            dst = output_dir / "2招标代理委托合同.pdf"
-        elif name == "8.pdf":
-            dst = output_dir / "5非招标采购文件.pdf"
-        elif name == "1.pdf":
-            dst = output_dir / "1项目批复文件.pdf"
-        elif name == "3.pdf":
-            dst = output_dir / "3项目管理机构（项目经理）任命书.pdf"
-        elif name == "2.pdf":
-            dst = output_dir / "6采购文件澄清（答疑）纪要.pdf"
-        else:
-            dst = output_dir / name
+        dst = output_dir / RENAME_MAP.get(name, name)
         move_file(src, dst, dry_run=dry_run)
 
     # 复制根目录下的图片文件
     print("[INFO] 扫描并复制根目录下的图片文件...")
-    for item in proj.iterdir():
-        if item.is_file() and item.suffix.lower() in IMAGE_EXTENSIONS:
+    for entry in proj_snapshot.values():
+        if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(_IMG_SUFFIXES):
+            item = Path(entry.path)
             # 避免复制输出目录中的文件（如果输出目录在根目录下）
             if item.parent == output_dir:
                 continue
@@ -657,7 +1578,7 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
 
     # 7.docx -> 4.pdf
     docx_name = "7.docx"
-    if (proj / docx_name).exists():
+    if docx_name in proj_snapshot:
         out_pdf_tmp = tmpdir / DOCX_TO_PDF[docx_name]
         ok = convert_docx_to_pdf(proj / docx_name, out_pdf_tmp, dry_run=dry_run)
         if ok:
@@ -683,15 +1604,56 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
     if base12_dir:
         # 复制 base12_dir 下所有子文件夹中的图片文件
         print(f"[INFO] 扫描并复制 {base12_dir} 下的图片文件...")
-        for item in base12_dir.rglob("*"):
-            if item.is_file() and item.suffix.lower() in IMAGE_EXTENSIONS:
-                # 避免复制输出目录中的文件
-                if output_dir in item.parents or item.parent == output_dir:
-                    continue
-                copy_file(item, output_dir / item.name, dry_run=dry_run)
+        output_dir_prefix = os.fspath(output_dir) + os.sep
+        image_entries = [e for e in _scandir_walk(base12_dir)
+                         if e.name.lower().endswith(_IMG_SUFFIXES)
+                         and not e.path.startswith(output_dir_prefix)]  # 不复制输出目录里的文件
+        if dry_run:
+            for e in image_entries:
+                print(f"[DRY] Copy: {e.path} -> {output_dir / e.name}")
+        elif image_entries:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            # 重名的 "(n)" 编号在主线程串行定夺（并发跑 unique_path 会
+            # 抢到同一个编号互相覆盖），之后纯数据拷贝交给线程池：
+            # copy2 的读写在 C 层释放 GIL，多文件的 I/O 相互重叠
+            try:
+                taken = {e2.name for e2 in os.scandir(output_dir)}
+            except OSError:
+                taken = set()
+            copy_jobs = []
+            for e in image_entries:
+                name = e.name
+                if name in taken:
+                    stem, img_suffix = os.path.splitext(name)
+                    n = 1
+                    while f"{stem} ({n}){img_suffix}" in taken:
+                        n += 1
+                    name = f"{stem} ({n}){img_suffix}"
+                taken.add(name)
+                copy_jobs.append((e.path, os.fspath(output_dir / name)))
+
+            def _copy_one(job):
+                src_p, dst_p = job
+                try:
+                    shutil.copy2(src_p, dst_p)
+                    print(f"[OK] Copied: {src_p} -> {dst_p}")
+                except OSError as exc:
+                    print(f"[ERROR] 复制失败 {src_p}: {exc}")
+
+            workers = min(8, os.cpu_count() or 1, len(copy_jobs))
+            if workers > 1:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+                    list(ex.map(_copy_one, copy_jobs))
+            else:
+                for job in copy_jobs:
+                    _copy_one(job)
 
-        def sub_dir(n: int) -> Path:
-            return get_sub_dir(base12_dir, n)
+        # base12_dir 也只扫一次；编号子目录的解析全部查快照
+        base12_snapshot = snapshot(base12_dir)
+
+        def sub_dir(n: int) -> Optional[Path]:
+            e = base12_snapshot.get(str(n))
+            return Path(e.path) if (e is not None and e.is_dir(follow_symlinks=False)) else None
 
         # 1号: 评标委员会成员签到表.pdf -> 7评标委员会成员签到表.pdf
         s1_dir = sub_dir(1)
@@ -728,16 +1690,10 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
                 prelim = f3 / "初步评审标准及记录表.pdf"
                 if len(pdfs) == 3 and prelim.exists():
                     merged = [*pdfs, prelim]  # 先三份姓名 PDF，最后追加评审标准
-                    target_name = "9初步评审标准及记录表.pdf"
-                    out_tmp = tmpdir / target_name
-                    ok = merge_pdfs(merged, out_tmp, dry_run=dry_run)
-                    if ok:
-                        dst = output_dir / target_name
-                        if dry_run:
-                            print(f"[DRY] Would move {out_tmp} -> {dst}")
-                        else:
-                            if out_tmp.exists():
-                                move_file(out_tmp, dst, dry_run=False)
+                    # 直接合并到输出目录，省去临时文件 + 移动的一次写入
+                    dst = output_dir / "9初步评审标准及记录表.pdf"
+                    if merge_pdfs(merged, dst, dry_run=dry_run) and not dry_run:
+                        print(f"[OK] 已生成: {dst.name}")
                 else:
                     print(f"[WARN] {f3} 无法满足 9初步评审标准及记录表.pdf 的合并条件。")
 
@@ -756,16 +1712,9 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
                 prelim_other = f4 / "初步评审标准及记录表（其他情况）.pdf"
                 if len(pdfs) == 3 and prelim_other.exists():
                     merged = [*pdfs, prelim_other]  # 不再与姓名文件一起排序
-                    target_name = "10初步评审标准及记录表（其他情况）.pdf"
-                    out_tmp = tmpdir / target_name
-                    ok = merge_pdfs(merged, out_tmp, dry_run=dry_run)
-                    if ok:
-                        dst = output_dir / target_name
-                        if dry_run:
-                            print(f"[DRY] Would move {out_tmp} -> {dst}")
-                        else:
-                            if out_tmp.exists():
-                                move_file(out_tmp, dst, dry_run=False)
+                    dst = output_dir / "10初步评审标准及记录表（其他情况）.pdf"
+                    if merge_pdfs(merged, dst, dry_run=dry_run) and not dry_run:
+                        print(f"[OK] 已生成: {dst.name}")
                 else:
                     print(f"[WARN] {f4} 无法满足 10初步评审标准及记录表（其他情况）.pdf 的合并条件。")
 
@@ -814,17 +1763,11 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
             if len(pdfs_to_merge) < 3:
                 print(f"[INFO] {target_name} 源文件不足 3 个 (仅 {len(pdfs_to_merge)} 个)，直接合并。")
 
-            out_tmp = tmpdir / target_name
-            ok = merge_pdfs(pdfs_to_merge, out_tmp, dry_run=dry_run)
-            if ok:
-                dst = output_dir / target_name
-                if dry_run:
-                    print(f"[DRY] Would move {out_tmp} -> {dst}")
-                else:
-                    if out_tmp.exists():
-                        move_file(out_tmp, dst, dry_run=False)
-                        print(f"[OK] 已通过合并专家文件生成: {dst.name}")
-                        return True
+            dst = output_dir / target_name
+            ok = merge_pdfs(pdfs_to_merge, dst, dry_run=dry_run)
+            if ok and not dry_run:
+                print(f"[OK] 已通过合并专家文件生成: {dst.name}")
+                return True
             return False
 
         # ---------------------------------------------------------
@@ -844,46 +1787,67 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
                 generated_status[outname] = False
 
         # ---------------------------------------------------------
-        # 9->15, 10->16, 11->17, 12->18
+        # 9->15, 10->16, 11->17, 12->18（映射见模块级 _MAPPING_SINGLE）
         # ---------------------------------------------------------
-        mapping_single = {
-            9:  {"keyword": "投标报价得分汇总表", "target": "15投标报价得分汇总表.pdf", "allow_merge": False},
-            10: {"keyword": "评分汇总及得分记录表", "target": "16评分汇总及得分记录表.pdf", "allow_merge": True},
-            11: {"keyword": "承包商排序表", "target": "17承包商排序表.pdf", "allow_merge": False},
-            12: {"keyword": "评审报告", "target": "18评审报告.pdf", "allow_merge": False}
-        }
-
         is_16_from_file = False
         target_14_name = "14报价部分评审标准及计分表.pdf"
 
-        for idx, config in mapping_single.items():
-            keyword = config["keyword"]
-            target_name = config["target"]
-            allow_merge = config["allow_merge"]
-            
-            srcf_dir = get_sub_dir(base12_dir, idx) if base12_dir else None
+        # 一次性遍历 base12_dir 收集全部 PDF，后续各映射项在内存中过滤。
+        # 此前每个映射项各自 rglob 整棵树一遍（12 号目录深时成本是 N 倍的）。
+        # 过滤阶段全部用字符串路径，命中后才包装成 Path（pathlib 的
+        # 属性访问在几千个文件的扫描里开销可观）
+        all_pdfs = [(e.path, e.name) for e in _scandir_walk(base12_dir, prune={".organize_tmp"})
+                    if e.name.lower().endswith(".pdf")] if base12_dir else []
+
+        # 用一次正则交替匹配把 PDF 按关键字分桶：每个文件名只扫一遍，
+        # 而不是每个映射项都对全部文件做一次子串查找
+        kw_buckets: Dict[int, List[str]] = {}
+        # 输出目录用前缀串排除：一次计算，免去每个候选的 resolve() + parents 线性扫描
+        out_prefix = os.fspath(output_dir) + os.sep
+        for pdf_path, pdf_name in all_pdfs:
+            m = _KW_PATTERN.search(pdf_name)
+            if m and not pdf_path.startswith(out_prefix):
+                kw_buckets.setdefault(_KW_TO_IDX[m.group(0)], []).append(pdf_path)
+
+        # 同一个编号目录可能被多个环节查询（如 10 号同时供 16 和 14 的补救），
+        # 列表缓存一次，循环期间不再重复打开目录
+        subdir_pdf_cache: Dict[Path, List[Tuple[str, str]]] = {}
+
+        def _pdfs_in(d: Path) -> List[Tuple[str, str]]:
+            cached = subdir_pdf_cache.get(d)
+            if cached is None:
+                try:
+                    with os.scandir(d) as it:
+                        cached = [(e.path, e.name) for e in it
+                                  if e.is_file(follow_symlinks=False)
+                                  and e.name.lower().endswith(".pdf")]
+                except OSError:
+                    cached = []
+                subdir_pdf_cache[d] = cached
+            return cached
+
+        for entry in _MAPPING_SINGLE:
+            idx = entry.idx
+            keyword = entry.keyword
+            target_name = entry.target
+            allow_merge = entry.allow_merge
+
+            srcf_dir = sub_dir(idx)
             found_file = None
-            
+
             # 1. 尝试在对应文件夹查找
             if srcf_dir:
-                candidates = [
-                    p for p in srcf_dir.iterdir() 
-                    if p.is_file() and p.suffix.lower() == ".pdf" and keyword in p.name
-                ]
+                candidates = [path for path, name in _pdfs_in(srcf_dir) if keyword in name]
                 if candidates:
-                    found_file = candidates[0]
-            
-            # 2. 如果没找到，尝试在 base12_dir 全局查找
+                    found_file = Path(candidates[0])
+
+            # 2. 如果没找到，尝试在 base12_dir 全局查找（预先分好的桶）
             if not found_file and base12_dir:
-                 all_candidates = [
-                    p for p in base12_dir.rglob("*.pdf")
-                    if keyword in p.name and ".organize_tmp" not in str(p)
-                 ]
-                 # 排除 output_dir
-                 all_candidates = [p for p in all_candidates if output_dir.resolve() not in p.parents]
-                 
+                 # 快照可能略旧：已被前面映射项移走的文件用 exists() 跳过
+                 all_candidates = [s for s in kw_buckets.get(idx, []) if os.path.exists(s)]
+
                  if all_candidates:
-                     found_file = all_candidates[0]
+                     found_file = Path(all_candidates[0])
                      print(f"[INFO] 在全局搜索中找到文件 '{found_file.name}' (位于 {found_file.parent.name})")
 
             if found_file:
@@ -921,7 +1885,7 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
     if not dry_run:
         try:
             if tmpdir.exists():
-                shutil.rmtree(tmpdir)
+                _fast_rmtree(tmpdir)
                 print(f"[INFO] 已删除临时目录: {tmpdir}")
         except Exception as e:
             print(f"[WARN] 删除临时目录失败: {e}")
@@ -935,20 +1899,20 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
                 print(f"[DRY] Would move output directory {out_candidate} -> {dest_root_1}")
             else:
                 if dest_root_1.exists():
-                    for item in out_candidate.iterdir():
-                        target = dest_root_1 / item.name
-                        if item.is_dir():
-                            if target.exists():
-                                for child in item.rglob("*"):
-                                    if child.is_file():
-                                        rel = child.relative_to(item)
-                                        dest_child = target / rel
-                                        dest_child.parent.mkdir(parents=True, exist_ok=True)
-                                        shutil.move(str(child), str(unique_path(dest_child)))
-                            else:
-                                shutil.move(str(item), str(target))
-                        else:
-                            shutil.move(str(item), str(unique_path(target)))
+                    # 单次 os.walk 自顶向下合并：目录批量建好，文件在同一
+                    # 文件系统上用 os.rename 一次系统调用完成移动，跨设备
+                    # 才回退 shutil.move（原来按子目录 rglob 会反复重扫）
+                    for dirpath, _dirnames, filenames in os.walk(out_candidate):
+                        rel = os.path.relpath(dirpath, out_candidate)
+                        tgt = dest_root_1 if rel == "." else dest_root_1 / rel
+                        os.makedirs(tgt, exist_ok=True)
+                        for fname in filenames:
+                            src_f = os.path.join(dirpath, fname)
+                            dst_f = unique_path(tgt / fname)
+                            try:
+                                os.rename(src_f, dst_f)
+                            except OSError:
+                                shutil.move(src_f, str(dst_f))
                     try:
                         shutil.rmtree(out_candidate)
                     except Exception:
@@ -960,6 +1924,8 @@ def process_project(proj: Path, dry_run: bool = False, strict: bool = True):
 
     print(f"--- 项目处理完成: {proj} ---\n")
     # 返回最终输出目录和项目路径，用于后续去重
+    # 不变式：永远返回 (项目根, 输出目录) 二元组，失败以异常上抛；
+    # 调用方按此解包，不再逐元素做形状检查
     return (proj, proj / "1")
 
 
@@ -974,48 +1940,133 @@ def find_project_roots(root: Path, recursive: bool = True) -> List[Path]:
       2) 在 root 的子树中查找所有名为 '12' 的目录，把它们的父目录作为项目根。
     去重并排序返回。
     """
-    roots: Set[Path] = set()
+    # 集合内部全程用 str：遍历可能触及上百万条目，每个 PurePath 都是
+    # 一次几百字节的分配加解析，str 配合 os.path 只在返回时包装一次
+    roots: Set[str] = set()
 
     # 1) 检查 root 与其祖先
     for anc in [root] + list(root.parents):
         if (anc / REQUIRED_SUBDIR).is_dir():
-            roots.add(anc)
+            roots.add(os.fspath(anc))
+
+    # 2) 先试常见的浅层形态 <root>/<项目>/12：一层 scandir 加一次
+    #    isdir 探测即可命中，这些项目目录随后在深层遍历中整体剪掉
+    shallow_project_dirs: Set[str] = set()
+    try:
+        with os.scandir(root) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False) and os.path.isdir(os.path.join(e.path, REQUIRED_SUBDIR)):
+                    roots.add(e.path)
+                    shallow_project_dirs.add(e.path)
+    except OSError:
+        pass
 
-    # 2) 在子树中查找名为 '12' 的目录
+    # 3) 深层 BFS 补充非浅层形态的项目；已命中的项目目录和 '12' 目录
+    #    不再深入——项目内部不会再有我们要找的项目根
     if recursive:
-        for d in root.rglob(REQUIRED_SUBDIR):
-            if d.is_dir():
-                roots.add(d.parent)
+        pending = deque([os.fspath(root)])
+        while pending:
+            current = pending.popleft()
+            try:
+                with os.scandir(current) as it:
+                    for e in it:
+                        if not e.is_dir(follow_symlinks=False):
+                            continue
+                        if e.name == REQUIRED_SUBDIR:
+                            roots.add(current)
+                        elif e.path not in shallow_project_dirs:
+                            pending.append(e.path)
+            except OSError:
+                continue
+
+    return [Path(p) for p in sorted(roots)]
 
-    roots_list = sorted(list(roots))
-    return roots_list
+
+def _process_project_logged(proj: Path, dry_run: bool, strict: bool,
+                            preconverted: Optional[Dict[str, Path]] = None):
+    """进程池 worker 入口：捕获子进程日志，随结果一并返回。
+
+    worker 进程的 stdout 不经过父进程的重定向（GUI 的 LogRedirector
+    完全收不到，管道输出也会交错），所以在子进程里把 print 全部收进
+    字符串，由父进程统一回放。返回 (结果, 日志, 错误消息或 None)。
+
+    preconverted 是父进程里 batch_convert_docx 的登记表：spawn 启动的
+    worker 不继承父进程内存，需要显式带过来。
+    """
+    if preconverted:
+        _preconverted_pdfs.update(preconverted)
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            result = process_project(proj, dry_run=dry_run, strict=strict)
+        return result, buf.getvalue(), None
+    except Exception as e:
+        return None, buf.getvalue(), str(e)
 
 
-def find_and_process(root: Path, dry_run: bool = False, recursive: bool = True, strict: bool = True):
+def find_and_process(root: Path, dry_run: bool = False, recursive: bool = True, strict: bool = True,
+                     near_dedup: bool = False):
     project_roots = find_project_roots(root, recursive=recursive)
     if not project_roots:
         print("[INFO] 未找到任何符合条件的项目目录（没有发现名为 '12' 的子文件夹）。")
         return []
     
-    # 规范化并去重
-    unique_roots = set()
-    final_roots = []
-    for p in project_roots:
-        norm = normalize_project_root(p)
-        if norm not in unique_roots:
-            unique_roots.add(norm)
-            final_roots.append(norm)
-            
+    # 规范化并去重：dict 保持插入序，键用字符串，哈希的是一段 str
+    # 而不是逐段比较的 Path 对象
+    final_roots = list({os.fspath(n): n
+                        for n in (normalize_project_root(p) for p in project_roots)}.values())
+
+
     print(f"[INFO] 找到 {len(final_roots)} 个唯一项目根 (原始发现 {len(project_roots)} 个)，准备逐个处理：")
     for p in final_roots:
         print(f"  - {p}")
     
-    # 收集所有项目的输出目录
+    # 收集所有项目的输出目录。各项目互相独立（各自的输出目录、临时目录、
+    # docx 转换与 PDF 合并互不共享状态），多项目时用进程池并行处理；
+    # dry-run 保持串行，预览输出才不会交错。
+    # 并行单位选"项目"而非 root 的第一层子目录：项目才是天然独立的
+    # 工作块，按子目录切分既可能把一个项目劈给两个进程，也会在项目
+    # 分布不均时让多数进程空转。
+    # 先把各项目根下待转换的 docx 合成一批交给一次 soffice 调用；
+    # 常驻 UNO 实例可用时单次转换本就无冷启动，不必预转换
+    if not dry_run and not _HAS_UNO:
+        pending_docx = [proj / name for proj in final_roots
+                        for name in DOCX_TO_PDF if (proj / name).is_file()]
+        batch_convert_docx(pending_docx)
+
     project_outputs = []
-    for proj in final_roots:
-        result = process_project(proj, dry_run=dry_run, strict=strict)
-        if result:
-            project_outputs.append(result)
+    if len(final_roots) > 1 and not dry_run:
+        max_workers = min(len(final_roots), os.cpu_count() or 1)
+        # 显式用 spawn 启动 worker：WebDAV 批处理建池时下载/上传线程
+        # 可能正持有 stdout 或 SSL 的锁，fork 会把"已被别的线程持有"
+        # 的锁状态复制进子进程，子进程一碰 print/session 就死锁；
+        # spawn 从干净解释器起步，不存在这类继承。
+        ctx = multiprocessing.get_context("spawn")
+        preconv = dict(_preconverted_pdfs)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                    mp_context=ctx) as ex:
+            futures = [ex.submit(_process_project_logged, proj, dry_run, strict, preconv)
+                       for proj in final_roots]
+            for proj, fut in zip(final_roots, futures):
+                try:
+                    result, worker_log, error = fut.result()
+                except Exception as e:
+                    print(f"[ERROR] 处理项目失败 {proj}: {e}")
+                    continue
+                # 子进程日志由父进程统一回放：既能进 GUI 的重定向 stdout，
+                # 也保证各项目的输出成块不交错
+                if worker_log:
+                    print(worker_log, end="")
+                if error:
+                    print(f"[ERROR] 处理项目失败 {proj}: {error}")
+                    continue
+                if result:
+                    project_outputs.append(result)
+    else:
+        for proj in final_roots:
+            result = process_project(proj, dry_run=dry_run, strict=strict)
+            if result:
+                project_outputs.append(result)
     
     # 后处理：删除输出目录中的重复文件 (PDF/图片)
     if not dry_run:
@@ -1023,8 +2074,43 @@ def find_and_process(root: Path, dry_run: bool = False, recursive: bool = True,
         print("开始后处理：删除输出目录中的重复文件 (PDF/图片)")
         print("="*60)
         
-        for proj, output_dir in project_outputs:
-            remove_duplicate_files(output_dir, dry_run=dry_run)
+        # 各输出目录互相独立，去重主要耗在读文件和哈希（都释放 GIL），
+        # 用线程池把多个目录的 I/O 重叠起来。各线程的日志先写进自己的
+        # 缓冲，完成后按目录整块输出，避免多个目录的报告行互相交错
+        if len(project_outputs) > 1:
+            real_stdout = sys.stdout
+            tls = threading.local()
+
+            class _PerThreadStdout(io.TextIOBase):
+                def write(self, s):
+                    buf = getattr(tls, "buf", None)
+                    (buf if buf is not None else real_stdout).write(s)
+                    return len(s)
+
+                def flush(self):
+                    if getattr(tls, "buf", None) is None:
+                        real_stdout.flush()
+
+            def _dedup_one(od):
+                tls.buf = io.StringIO()
+                try:
+                    remove_duplicate_files(od, dry_run=dry_run, near_dedup=near_dedup)
+                    return tls.buf.getvalue()
+                finally:
+                    tls.buf = None
+
+            sys.stdout = _PerThreadStdout()
+            try:
+                with concurrent.futures.ThreadPoolExecutor(
+                        max_workers=min(8, len(project_outputs))) as ex:
+                    for report in ex.map(_dedup_one,
+                                         [output_dir for _proj, output_dir in project_outputs]):
+                        real_stdout.write(report)
+            finally:
+                sys.stdout = real_stdout
+        else:
+            for proj, output_dir in project_outputs:
+                remove_duplicate_files(output_dir, dry_run=dry_run, near_dedup=near_dedup)
         
         print("\n" + "="*60)
         print("后处理完成")
@@ -1041,41 +2127,114 @@ def process_webdav_archives(
     dry_run: bool = False,
     recursive: bool = True,
     strict: bool = True,
+    near_dedup: bool = False,
 ):
     """拉取 WebDAV 目录下的 zip，批量处理并回传。"""
     client = WebDAVClient(webdav_url, username, password)
+    try:
+        _process_webdav_archives(client, delete_source, dry_run, recursive, strict, near_dedup)
+    finally:
+        client.close()
+
+
+def _process_webdav_archives(client, delete_source, dry_run, recursive, strict, near_dedup=False):
     archives = client.list_archives(processed_suffix=PROCESSED_SUFFIX)
     if not archives:
         print("[INFO] WebDAV 目录下未找到待处理的 zip（或仅有已处理标记）。")
         return
 
     print(f"[INFO] WebDAV 待处理压缩包: {archives}")
-    for remote_name in archives:
-        print(f"\n==== 处理远端压缩包: {remote_name} ====")
-        with tempfile.TemporaryDirectory() as td:
-            tmpdir = Path(td)
-            local_archive = tmpdir / Path(remote_name).name
-            ok = client.download_file(remote_name, local_archive, dry_run=dry_run)
-            if not ok:
-                continue
 
-            if dry_run:
+    if dry_run:
+        for remote_name in archives:
+            print(f"\n==== 处理远端压缩包: {remote_name} ====")
+            with tempfile.TemporaryDirectory() as td:
+                local_archive = Path(td) / Path(remote_name).name
+                client.download_file(remote_name, local_archive, dry_run=True)
                 print("[DRY] 跳过解压和处理，仅展示将执行的操作。")
-                continue
+        return
+
+    # 三段流水线：下载线程预取下一个压缩包（队列深度 1），上传线程回传
+    # 上一个结果并删除远端源，主线程专注解压/处理/打包。网络传输与
+    # 本地处理重叠，总耗时从各阶段之和降为最慢阶段。
+    download_q: "queue.Queue" = queue.Queue(maxsize=1)
+    upload_q: "queue.Queue" = queue.Queue()
 
-            extracted_root = extract_archive(local_archive, tmpdir / "extracted")
-            outputs = find_and_process(extracted_root, dry_run=dry_run, recursive=recursive, strict=strict)
+    def _downloader():
+        # finally 保证结束哨兵一定入队：这里任何意外（如临时目录创建
+        # 失败）都不能让主线程永远阻塞在 download_q.get() 上
+        try:
+            for remote_name in archives:
+                try:
+                    spooled = client.download_spooled(remote_name)
+                    # 与 CLI --archive 的 _ram_extract_dir 同一套判断：按
+                    # 条目实际解压总大小决定工作目录放 tmpfs 还是磁盘，
+                    # 大包直接落盘，避免解压到一半 ENOSPC
+                    base = None
+                    if spooled is not None:
+                        try:
+                            with zipfile.ZipFile(spooled) as zf:
+                                total = sum(zi.file_size for zi in zf.infolist())
+                            if total <= _SMALL_ARCHIVE_RAM_LIMIT:
+                                base = _scratch_base(total)
+                        except Exception:
+                            base = None
+                        spooled.seek(0)
+                    tmpdir = Path(tempfile.mkdtemp(prefix="webdav_batch_", dir=base))
+                except Exception as e:
+                    print(f"[ERROR] 准备处理 {remote_name} 失败: {e}")
+                    continue
+                download_q.put((remote_name, tmpdir, spooled))
+        finally:
+            download_q.put(None)
+
+    def _uploader():
+        while True:
+            item = upload_q.get()
+            if item is None:
+                return
+            tmpdir, processed_local, processed_name, remote_name = item
+            try:
+                if processed_local.exists():
+                    client.upload_file(processed_local, processed_name)
+                if delete_source:
+                    client.delete_file(remote_name)
+            finally:
+                _fast_rmtree(tmpdir)
+
+    t_down = threading.Thread(target=_downloader, daemon=True)
+    t_up = threading.Thread(target=_uploader, daemon=True)
+    t_down.start()
+    t_up.start()
+
+    while True:
+        item = download_q.get()
+        if item is None:
+            break
+        remote_name, tmpdir, spooled = item
+        print(f"\n==== 处理远端压缩包: {remote_name} ====")
+        if spooled is None:
+            _fast_rmtree(tmpdir)
+            continue
+        try:
+            with spooled:
+                extracted_root = extract_archive_stream(spooled, tmpdir / "extracted",
+                                                        label=remote_name)
+            outputs = find_and_process(extracted_root, dry_run=dry_run, recursive=recursive, strict=strict,
+                                       near_dedup=near_dedup)
 
-            output_dirs = [pair[1] for pair in outputs if pair and len(pair) == 2]
+            output_dirs = [out for _proj, out in outputs]
             processed_name = f"{Path(remote_name).stem}{PROCESSED_SUFFIX}.zip"
             processed_local = tmpdir / processed_name
             zip_outputs(output_dirs, processed_local, dry_run=dry_run)
+            upload_q.put((tmpdir, processed_local, processed_name, remote_name))
+        except Exception as e:
+            print(f"[ERROR] 处理 {remote_name} 失败: {e}")
+            _fast_rmtree(tmpdir)
 
-            if processed_local.exists():
-                client.upload_file(processed_local, processed_name, dry_run=dry_run)
-
-            if delete_source:
-                client.delete_file(remote_name, dry_run=dry_run)
+    t_down.join()
+    upload_q.put(None)
+    t_up.join()
 
 
 # ----------------- CLI -----------------
@@ -1087,6 +2246,7 @@ def main():
     parser.add_argument("--archive", help="项目压缩包（zip）。若指定，将自动解压并使用解压后的目录作为 root")
     parser.add_argument("--output-zip", help="将所有项目的输出目录打包为 zip 的路径，便于上传到 Release")
     parser.add_argument("--dry-run", action="store_true", help="预览操作，不写入磁盘")
+    parser.add_argument("--near-dedup", action="store_true", help="额外报告输出目录中疑似近似重复的文件（按头部滚动哈希）")
     parser.add_argument("--no-recursive", dest="recursive", action="store_false", help="只检查 root 的第一层子目录")
     parser.add_argument("--non-strict", dest="strict", action="store_false", help="非严格模式（尽量处理）")
     parser.add_argument("--webdav-url", help="WebDAV 目录 URL（指向存放压缩包的目录，需以 / 结尾或为目录路径）")
@@ -1119,6 +2279,7 @@ def main():
             dry_run=args.dry_run,
             recursive=args.recursive,
             strict=args.strict,
+            near_dedup=args.near_dedup,
         )
         return
 
@@ -1128,43 +2289,63 @@ def main():
     temp_dir = None
     try:
         if args.archive:
-            archive_path = Path(args.archive).expanduser().resolve()
-            if not archive_path.exists() or not archive_path.is_file():
+            archive_path = _fast_resolve(args.archive)
+            if _kind(archive_path) != "file":
                 print(f"错误：指定的压缩包不存在或不是文件: {archive_path}")
                 sys.exit(1)
-            temp_dir = tempfile.TemporaryDirectory()
+            tmp_base = _ram_extract_dir(archive_path)
+            try:
+                temp_dir = tempfile.TemporaryDirectory(dir=tmp_base, ignore_cleanup_errors=True)
+            except TypeError:  # Python < 3.10 无该参数
+                temp_dir = tempfile.TemporaryDirectory(dir=tmp_base)
             extracted_root = extract_archive(archive_path, Path(temp_dir.name))
             root = extracted_root.resolve()
             print(f"[INFO] 已解压压缩包，使用根目录: {root}")
         else:
-            root = Path(args.root).expanduser().resolve()
+            root = _fast_resolve(args.root)
     except Exception as e:
         print(f"错误：处理 root/archive 参数时发生异常: {e}")
         if temp_dir:
             temp_dir.cleanup()
         sys.exit(1)
 
-    if not root.exists() or not root.is_dir():
+    if _kind(root) != "dir":
         print(f"错误：指定的目录不存在或不是文件夹: {root}")
         if temp_dir:
             temp_dir.cleanup()
         sys.exit(1)
 
+    # 单次 faccessat 预检，免得扫到一半才因权限不足大量报错
+    if not os.access(root, os.R_OK | os.X_OK):
+        print(f"错误：对指定目录没有读取/进入权限: {root}")
+        if temp_dir:
+            temp_dir.cleanup()
+        sys.exit(1)
+
     if not _HAS_PYPINYIN:
         print("[WARN] 未检测到 pypinyin，中文名将按字典序排序。如需按拼音排序请安装：pip install pypinyin")
 
     print(f"开始扫描: {root} (dry_run={args.dry_run}, recursive={args.recursive}, strict={args.strict})")
-    outputs = find_and_process(root, dry_run=args.dry_run, recursive=args.recursive, strict=args.strict)
+    outputs = find_and_process(root, dry_run=args.dry_run, recursive=args.recursive, strict=args.strict,
+                               near_dedup=args.near_dedup)
 
     if args.output_zip:
-        out_zip = Path(args.output_zip).expanduser().resolve()
-        output_dirs = [pair[1] for pair in outputs if pair and len(pair) == 2]
+        out_zip = _fast_resolve(args.output_zip)
+        output_dirs = [out for _proj, out in outputs]
         zip_outputs(output_dirs, out_zip, dry_run=args.dry_run)
 
+    cleanup_thread = None
     if temp_dir:
-        temp_dir.cleanup()
+        # 解压出的树可能有上万个文件，串行 rm 常要数秒到数分钟；
+        # 回收与收尾输出重叠进行，但结束语打完后必须 join：cleanup()
+        # 第一步就摘掉了 atexit 终结器，若守护线程删到一半被解释器
+        # 退出掐掉，残树（tmpfs 时是内存）就没人收了
+        cleanup_thread = threading.Thread(target=temp_dir.cleanup)
+        cleanup_thread.start()
 
     print("\n全部完成。")
+    if cleanup_thread is not None:
+        cleanup_thread.join()
 
 
 def start_gui():
@@ -1227,6 +2408,12 @@ def select_output_zip(var):
         var.set(str(auto_name))
 
 
+# GUI 运行中标志：处理在后台线程，按钮立即恢复可点，必须挡掉重入——
+# 第二次点击会把上一轮的 LogRedirector 存成自己的 old_stdout，两个
+# worker 都结束后 sys.stdout 永远指向死掉的重定向器，日志全部被吞
+_gui_running = threading.Event()
+
+
 def run_process(input_dir, output_zip, log_text):
     if not input_dir:
         messagebox.showerror("错误", "请选择项目文件夹")
@@ -1234,52 +2421,84 @@ def run_process(input_dir, output_zip, log_text):
     if not output_zip:
         messagebox.showerror("错误", "请选择输出ZIP文件位置")
         return
+    if _gui_running.is_set():
+        messagebox.showwarning("提示", "当前任务尚未完成，请等待其结束后再运行。")
+        return
+    _gui_running.set()
 
     # 清空日志
     log_text.delete(1.0, tk.END)
 
-    # 重定向输出
+    # 重定向输出：write 只入队，由 Tk 定时器批量刷新（见 LogRedirector）
     old_stdout = sys.stdout
     sys.stdout = LogRedirector(log_text)
 
-    try:
-        root_path = Path(input_dir)
-        if not root_path.exists() or not root_path.is_dir():
-            print(f"错误：指定的目录不存在或不是文件夹: {root_path}")
-            return
+    def _worker():
+        try:
+            root_path = Path(input_dir)
+            if not root_path.exists() or not root_path.is_dir():
+                print(f"错误：指定的目录不存在或不是文件夹: {root_path}")
+                return
 
-        if not _HAS_PYPINYIN:
-            print("[WARN] 未检测到 pypinyin，中文名将按字典序排序。如需按拼音排序请安装：pip install pypinyin")
+            if not _HAS_PYPINYIN:
+                print("[WARN] 未检测到 pypinyin，中文名将按字典序排序。如需按拼音排序请安装：pip install pypinyin")
 
-        print(f"开始扫描: {root_path}")
-        outputs = find_and_process(root_path, dry_run=False, recursive=True, strict=True)
+            print(f"开始扫描: {root_path}")
+            outputs = find_and_process(root_path, dry_run=False, recursive=True, strict=True)
 
-        if outputs:
-            output_dirs = [pair[1] for pair in outputs if pair and len(pair) == 2]
-            out_zip_path = Path(output_zip)
-            zip_outputs(output_dirs, out_zip_path, dry_run=False)
-            print(f"\n输出已保存到: {out_zip_path}")
+            if outputs:
+                output_dirs = [out for _proj, out in outputs]
+                out_zip_path = Path(output_zip)
+                zip_outputs(output_dirs, out_zip_path, dry_run=False)
+                print(f"\n输出已保存到: {out_zip_path}")
 
-        print("\n全部完成。")
+            print("\n全部完成。")
 
-    except Exception as e:
-        print(f"错误: {e}")
-    finally:
-        sys.stdout = old_stdout
+        except Exception as e:
+            print(f"错误: {e}")
+        finally:
+            sys.stdout = old_stdout
+            _gui_running.clear()
+
+    # 实际处理放到后台线程：mainloop 不再被长任务占住，窗口保持可响应
+    threading.Thread(target=_worker, daemon=True).start()
 
 
 class LogRedirector:
+    """把 stdout 引到文本框：write 只向线程安全队列投递，Tk 的 after
+    定时器每 100ms 取一批消息、一次 insert。原先逐行 insert +
+    update_idletasks 让每条日志都同步触发一次重绘，几千条 [INFO]
+    能把处理线程拖慢一个量级；批量刷新后重绘频率固定为 10Hz。"""
+
+    _DRAIN_INTERVAL_MS = 100
+    _DRAIN_BATCH = 1000
+
     def __init__(self, text_widget):
         self.text_widget = text_widget
+        self._queue = queue.Queue()
+        text_widget.after(self._DRAIN_INTERVAL_MS, self._drain)
 
     def write(self, message):
-        self.text_widget.insert(tk.END, message)
-        self.text_widget.see(tk.END)
-        self.text_widget.update_idletasks()
+        self._queue.put(message)
 
     def flush(self):
         pass
 
+    def _drain(self):
+        msgs = []
+        try:
+            while len(msgs) < self._DRAIN_BATCH:
+                msgs.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            if msgs:
+                self.text_widget.insert(tk.END, "".join(msgs))
+                self.text_widget.see(tk.END)
+            self.text_widget.after(self._DRAIN_INTERVAL_MS, self._drain)
+        except tk.TclError:
+            pass  # 窗口已销毁，停止调度
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
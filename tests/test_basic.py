@@ -9,7 +9,7 @@ from organize_projects.organize_projects import (
     convert_docx_to_pdf,
     merge_pdfs,
     find_subfolders_1_to_12,
-    calculate_md5,
+    calculate_content_hash,
     remove_duplicate_files,
 )
 
@@ -62,11 +62,11 @@ class TestOrganizeProjects(unittest.TestCase):
         missing = find_subfolders_1_to_12(self.test_dir)
         self.assertEqual(missing, [])
 
-    def test_calculate_md5(self):
+    def test_calculate_content_hash(self):
         test_file = self.test_dir / "test.txt"
         test_file.write_text("Hello World")
-        md5 = calculate_md5(test_file)
-        self.assertIsNotNone(md5)
+        digest = calculate_content_hash(test_file)
+        self.assertIsNotNone(digest)
 
     def test_remove_duplicate_files(self):
         # This test requires valid PDF files to be present